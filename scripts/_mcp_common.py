@@ -0,0 +1,1226 @@
+# _mcp_common.py
+# Shared implementation of the MCP server; mcp-server.py is the entry point.
+# Keeping the code in an importable module lets CPython cache its bytecode.
+from mcp.server.fastmcp import FastMCP, Context
+from contextlib import asynccontextmanager
+from collections.abc import AsyncIterator, Mapping
+from dataclasses import dataclass, field
+import os
+import secrets
+import textwrap
+import asyncio
+import threading
+from web3 import Web3, AsyncWeb3, AsyncHTTPProvider
+from web3.exceptions import ContractLogicError, TimeExhausted, TransactionNotFound
+from web3.providers.rpc.utils import ExceptionRetryConfiguration
+from Crypto.Hash import keccak
+from eth_abi import encode as abi_encode, decode as abi_decode
+from dotenv import load_dotenv
+import aiohttp
+import re
+import logging
+import logging.handlers
+import queue
+import atexit
+import json
+import time
+import functools
+import hashlib
+from collections import OrderedDict
+
+# Configure logging; callers only enqueue records, a background listener
+# thread does the actual stream and file writes
+log_formatter = logging.Formatter('[%(asctime)s] [%(name)s] [%(levelname)s] %(message)s')
+log_handlers = [
+    logging.StreamHandler(),
+    logging.FileHandler("mcp_server.log")
+]
+for handler in log_handlers:
+    handler.setFormatter(log_formatter)
+
+log_queue = queue.Queue(-1)
+log_listener = logging.handlers.QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# The listener's handlers apply the full format; the queue side passes the message through
+queue_handler = logging.handlers.QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+logger = logging.getLogger("ethereum-legal-docs")
+
+# Use the libuv event loop where it is installed; it is not available on Windows
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
+# orjson is optional; without it the provider keeps web3's stdlib json encoding
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Load environment variables
+load_dotenv()
+
+# How long fetched fee data is reused (roughly one Sepolia block)
+FEE_TTL = 12
+
+# EIP-1559 tip offered to block producers
+PRIORITY_FEE = Web3.to_wei(2, "gwei")
+
+# Receipt waits: how often new blocks are checked for, and when to give up.
+# Defaults for the RECEIPT_POLL_LATENCY / RECEIPT_TIMEOUT environment variables;
+# Sepolia produces a block every ~12s, so polling faster than this only adds load
+RECEIPT_POLL_LATENCY = 2.0
+RECEIPT_TIMEOUT = 300
+
+# How often the background task re-checks that the RPC endpoint is reachable
+HEALTH_CHECK_INTERVAL = 30
+
+# HTTP connection pool size, per-request timeout and retry policy for the RPC endpoint
+RPC_POOL_SIZE = 50
+RPC_TIMEOUT = 30
+RPC_RETRIES = 3
+RPC_BACKOFF_FACTOR = 0.3
+# Error statuses worth retrying: rate limiting and gateway failures. Anything else
+# (e.g. 401/403/404 from a bad URL or key) fails on the first attempt
+RPC_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+# Document hash memoization: texts up to the inline limit are cached as-is,
+# longer ones under a short digest so the cache does not pin large strings
+KECCAK_CACHE_SIZE = 1024
+KECCAK_CACHE_INLINE_LIMIT = 4096
+
+# Contract ABIs, built once at import and shared by every lifespan
+MCP_INTEGRATION_ABI = (
+    {"inputs": [{"type": "string"}, {"type": "string"}], "name": "requestDocumentGeneration", "outputs": [{"type": "uint256"}], "stateMutability": "nonpayable", "type": "function"},
+    {"inputs": [{"type": "uint256"}, {"type": "string"}, {"type": "string"}], "name": "fulfillDocumentRequest", "outputs": [], "stateMutability": "nonpayable", "type": "function"},
+    {"inputs": [{"type": "uint256"}, {"type": "string"}], "name": "receiveAIResponse", "outputs": [], "stateMutability": "nonpayable", "type": "function"},
+)
+
+DOCUMENT_REGISTRY_ABI = (
+    {"inputs": [{"type": "bytes32"}, {"type": "string"}, {"type": "string"}], "name": "registerDocument", "outputs": [{"type": "bytes32"}], "stateMutability": "nonpayable", "type": "function"},
+    {"inputs": [{"type": "bytes32"}, {"type": "bytes32"}], "name": "verifyDocument", "outputs": [{"type": "bool"}], "stateMutability": "view", "type": "function"},
+)
+
+# 4-byte selectors for the contract calls we encode by hand
+REQUEST_DOCUMENT_GENERATION_SELECTOR = Web3.keccak(text="requestDocumentGeneration(string,string)")[:4]
+FULFILL_DOCUMENT_REQUEST_SELECTOR = Web3.keccak(text="fulfillDocumentRequest(uint256,string,string)")[:4]
+REGISTER_DOCUMENT_SELECTOR = Web3.keccak(text="registerDocument(bytes32,string,string)")[:4]
+VERIFY_DOCUMENT_SELECTOR = Web3.keccak(text="verifyDocument(bytes32,bytes32)")[:4]
+GET_USER_DOCUMENTS_SELECTOR = Web3.keccak(text="getUserDocuments()")[:4]
+GET_DOCUMENT_SELECTOR = Web3.keccak(text="getDocument(bytes32)")[:4]
+GET_DOCUMENT_OUTPUT_TYPES = ["address", "bytes32", "uint256", "string", "string"]
+
+# Verification results are reused for a short while, so repeated checks of the
+# same (document ID, content) pair skip the eth_call. Only answered calls are
+# cached; unknown IDs revert, and a registered ID's hash never changes
+VERIFY_CACHE_SIZE = 4096
+VERIFY_CACHE_TTL = 60
+
+# Event signature topics (topics[0]) of the logs read back from receipts
+DOCUMENT_GENERATION_REQUESTED_TOPIC = Web3.keccak(text="DocumentGenerationRequested(uint256,address,string,uint256)")
+DOCUMENT_GENERATION_FULFILLED_TOPIC = Web3.keccak(text="DocumentGenerationFulfilled(uint256,address,bytes32)")
+DOCUMENT_REGISTERED_TOPIC = Web3.keccak(text="DocumentRegistered(address,bytes32,bytes32,string)")
+
+# Multicall3 is deployed at the same address on Sepolia and most other chains;
+# aggregate3 runs many view calls in one eth_call, each allowed to fail on its own
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+AGGREGATE3_SELECTOR = Web3.keccak(text="aggregate3((address,bool,bytes)[])")[:4]
+
+# Metadata attached to every document this server registers
+DOCUMENT_METADATA = "Generated via Claude MCP"
+
+def _abi_string_tail(value: str) -> bytes:
+    """ABI tail of a string argument: 32-byte length, then the UTF-8 data zero-padded to 32 bytes"""
+    data = value.encode("utf-8")
+    return len(data).to_bytes(32, "big") + data + b"\0" * (-len(data) % 32)
+
+# The metadata argument never changes, so its encoding is spliced in as-is
+DOCUMENT_METADATA_TAIL = _abi_string_tail(DOCUMENT_METADATA)
+
+# Generated document text. Sent on-chain as fulfillDocumentRequest calldata, where
+# every byte costs gas, so the source indentation is stripped once at import
+DOCUMENT_TEMPLATE = textwrap.dedent("""\
+    {document_type}
+    
+    Based on the following requirements:
+    {requirements}
+    
+    [Document content would be generated here in production]
+    """)
+
+@dataclass
+class BlockchainContext:
+    provider: AsyncWeb3
+    wallet_address: str
+    private_key: str  # Added to sign transactions
+    mcp_integration_contract: any
+    document_registry_contract: any
+    chain_id: int = 0  # Fixed for the connection, read once at startup
+    nonce: int = 0  # Next nonce to use, tracked locally after startup
+    nonce_lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+    nonce_stale: bool = False  # Set when a resync failed; the next nonce reloads first
+    fees: dict = None  # Fee fields for new transactions, see transaction_fees()
+    fees_ts: float = 0.0
+    receipt_poll_latency: float = RECEIPT_POLL_LATENCY
+    receipt_timeout: float = RECEIPT_TIMEOUT
+    # Whether tools should talk to the chain; refreshed by a background task so
+    # tool calls don't spend a round trip on is_connected()
+    is_live: bool = False
+    # Contract addresses resolved once in app_lifespan. They are EIP-55
+    # checksummed, the form web3 formats log addresses in, so receipt scans
+    # compare them with a plain ==
+    mcp_addr: str = ""
+    registry_addr: str = ""
+
+    async def fees_cached(self) -> dict:
+        """Return the fee fields for a new transaction, refreshed at most once per FEE_TTL"""
+        now = time.monotonic()
+        if not self.fees or now - self.fees_ts >= FEE_TTL:
+            block = await self.provider.eth.get_block("latest")
+            base_fee = block.get("baseFeePerGas")
+            # Only chains without EIP-1559 need the separate gas price call
+            gas_price = None if base_fee is not None else await self.provider.eth.gas_price
+            self.fees = transaction_fees(base_fee, gas_price)
+            self.fees_ts = now
+        return self.fees
+
+    async def _load_nonce(self) -> None:
+        # The pending count includes our own transactions still in the mempool
+        self.nonce = await self.provider.eth.get_transaction_count(self.wallet_address, "pending")
+        self.nonce_stale = False
+
+    async def next_nonce(self) -> int:
+        """Hand out the next local nonce"""
+        # Waits out a resync in progress so no nonce is handed out from a stale counter
+        async with self.nonce_lock:
+            if self.nonce_stale:
+                # A failed resync left the counter unreliable; raises if the node is still down
+                await self._load_nonce()
+                logger.info(f"Nonce reloaded to {self.nonce}")
+            nonce = self.nonce
+            self.nonce += 1
+            return nonce
+
+    async def resync_nonce(self) -> None:
+        """Reload the nonce from the node after a failed or stuck submission
+        
+        Never raises, so the caller's original error is the one reported. If
+        the node cannot be reached the counter is marked stale and reloaded
+        before the next nonce is handed out.
+        """
+        async with self.nonce_lock:
+            try:
+                await self._load_nonce()
+            except Exception as e:
+                self.nonce_stale = True
+                logger.warning(f"Nonce resync failed, reloading before the next transaction: {str(e)}")
+                return
+        logger.info(f"Nonce resynced to {self.nonce}")
+
+def transaction_fees(base_fee, gas_price=None) -> dict:
+    """Fee fields for a transaction given the latest block's base fee
+    
+    With EIP-1559 this is a type 2 transaction whose fee cap covers the base
+    fee doubling before inclusion; without a base fee it falls back to a
+    legacy gasPrice with a small multiplier for faster confirmation.
+    """
+    if base_fee is None:
+        return {'gasPrice': int(gas_price * 1.1)}
+    return {
+        'type': 2,
+        'maxPriorityFeePerGas': PRIORITY_FEE,
+        'maxFeePerGas': base_fee * 2 + PRIORITY_FEE,
+    }
+
+def _keccak(data: bytes) -> bytes:
+    """Keccak-256 through pycryptodome's C implementation"""
+    return keccak.new(data=data, digest_bits=256).digest()
+
+@functools.lru_cache(maxsize=KECCAK_CACHE_SIZE)
+def _keccak_small(text: str) -> bytes:
+    return _keccak(text.encode("utf-8"))
+
+_keccak_large_cache = OrderedDict()
+_keccak_large_lock = threading.Lock()
+
+def _keccak_large(text: str) -> bytes:
+    # Runs in a worker thread, so only the cache bookkeeping takes the lock
+    data = text.encode("utf-8")
+    key = (len(data), hashlib.blake2b(data, digest_size=16).digest())
+    with _keccak_large_lock:
+        document_hash = _keccak_large_cache.get(key)
+        if document_hash is not None:
+            _keccak_large_cache.move_to_end(key)
+            return document_hash
+    
+    document_hash = _keccak(data)
+    with _keccak_large_lock:
+        _keccak_large_cache[key] = document_hash
+        if len(_keccak_large_cache) > KECCAK_CACHE_SIZE:
+            _keccak_large_cache.popitem(last=False)
+    return document_hash
+
+async def hash_document(text: str) -> bytes:
+    """Keccak-256 of a document's text, memoized so repeat calls skip rehashing
+    
+    Large documents are hashed in a worker thread to keep the event loop free.
+    """
+    if len(text) <= KECCAK_CACHE_INLINE_LIMIT:
+        return _keccak_small(text)
+    return await asyncio.to_thread(_keccak_large, text)
+
+# (registry address, document ID, document hash) -> (verified, expiry time);
+# only touched from the event loop, so no lock is needed
+_verify_cache = OrderedDict()
+
+def _verify_cache_get(key):
+    """Return the cached verification result for key, or None if absent or expired"""
+    entry = _verify_cache.get(key)
+    if entry is None:
+        return None
+    verified, expires = entry
+    if time.monotonic() >= expires:
+        del _verify_cache[key]
+        return None
+    _verify_cache.move_to_end(key)
+    return verified
+
+def _verify_cache_put(key, verified):
+    _verify_cache[key] = (verified, time.monotonic() + VERIFY_CACHE_TTL)
+    _verify_cache.move_to_end(key)
+    if len(_verify_cache) > VERIFY_CACHE_SIZE:
+        _verify_cache.popitem(last=False)
+
+def _orjson_default(obj):
+    # The types web3's own JSON encoder handles beyond plain JSON
+    if isinstance(obj, (bytes, bytearray)):
+        return Web3.to_hex(obj)
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError
+
+# A bare number of 19+ digits may not fit in 64 bits. orjson silently parses
+# those as floats, so responses containing one go through the stdlib decoder.
+# Digit runs inside hex strings follow a hex digit, 'x' or a quote and are skipped
+_WIDE_INT_LITERAL = re.compile(rb'(?<![0-9A-Za-z"])[0-9]{19,}')
+
+class OrjsonAsyncHTTPProvider(AsyncHTTPProvider):
+    """AsyncHTTPProvider that encodes and decodes JSON-RPC payloads with orjson
+    
+    orjson only handles 64-bit integers. Payloads it refuses to encode, and
+    responses with integer literals that may exceed 64 bits (which orjson
+    would turn into floats), go through web3's stdlib encoder or decoder.
+    """
+
+    @staticmethod
+    def encode_rpc_dict(rpc_dict) -> bytes:
+        try:
+            return orjson.dumps(rpc_dict, default=_orjson_default)
+        except TypeError:
+            return AsyncHTTPProvider.encode_rpc_dict(rpc_dict)
+
+    @staticmethod
+    def decode_rpc_response(raw_response: bytes):
+        if _WIDE_INT_LITERAL.search(raw_response):
+            return AsyncHTTPProvider.decode_rpc_response(raw_response)
+        try:
+            return orjson.loads(raw_response)
+        except orjson.JSONDecodeError:
+            return AsyncHTTPProvider.decode_rpc_response(raw_response)
+
+class RetryableHTTPError(aiohttp.ClientResponseError):
+    """An RPC response whose status is in RPC_RETRY_STATUSES"""
+
+async def _raise_for_retryable_status(response):
+    # Session-level status hook; other error statuses reach web3's own
+    # raise_for_status, which the provider's retry policy does not cover
+    if response.status in RPC_RETRY_STATUSES:
+        response.release()
+        raise RetryableHTTPError(
+            response.request_info,
+            response.history,
+            status=response.status,
+            message=response.reason,
+            headers=response.headers
+        )
+
+def _env_seconds(name: str, default: float) -> float:
+    """Read a positive duration in seconds from the environment
+    
+    A missing, malformed or non-positive value falls back to the default.
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        seconds = float(value)
+    except ValueError:
+        seconds = None
+    if seconds is None or not 0 < seconds < float("inf"):
+        logger.warning(f"Invalid {name} {value!r}, using default of {default}s")
+        return default
+    return seconds
+
+@asynccontextmanager
+async def app_lifespan(server: FastMCP) -> AsyncIterator[BlockchainContext]:
+    """Manage application lifecycle with blockchain connections"""
+    # Initialize on startup
+    logger.info("Initializing blockchain connections...")
+    session = None
+    health_task = None
+    
+    # Receipt polling can be tuned per network; parsed up front so a bad value
+    # cannot land in the mock fallback below
+    receipt_poll_latency = _env_seconds("RECEIPT_POLL_LATENCY", RECEIPT_POLL_LATENCY)
+    receipt_timeout = _env_seconds("RECEIPT_TIMEOUT", RECEIPT_TIMEOUT)
+    
+    try:
+        # Load contract addresses from environment
+        DOCUMENT_REGISTRY_ADDRESS = os.getenv("DOCUMENT_REGISTRY_ADDRESS")
+        MCP_INTEGRATION_ADDRESS = os.getenv("MCP_INTEGRATION_ADDRESS")
+        
+        if not DOCUMENT_REGISTRY_ADDRESS or not MCP_INTEGRATION_ADDRESS:
+            logger.warning("Missing contract addresses, using mock values for testing")
+            DOCUMENT_REGISTRY_ADDRESS = "0x0000000000000000000000000000000000000000"
+            MCP_INTEGRATION_ADDRESS = "0x0000000000000000000000000000000000000000"
+        
+        # Initialize provider
+        SEPOLIA_RPC_URL = os.getenv("SEPOLIA_RPC_URL")
+        if not SEPOLIA_RPC_URL:
+            logger.warning("Missing RPC URL, using default Infura endpoint")
+            SEPOLIA_RPC_URL = "https://sepolia.infura.io/v3/9aa3d95b3bc440fa88ea12eaa4456161"
+            
+        # Async provider, so tools awaiting RPCs and receipts never block the
+        # event loop. Read calls that fail on connection errors, timeouts or
+        # RPC_RETRY_STATUSES responses are retried with backoff. web3's validation
+        # middleware re-reads eth_chainId before every eth_call; let the
+        # provider answer that one from cache
+        provider_class = OrjsonAsyncHTTPProvider if orjson is not None else AsyncHTTPProvider
+        http_provider = provider_class(
+            SEPOLIA_RPC_URL,
+            request_kwargs={"timeout": aiohttp.ClientTimeout(total=RPC_TIMEOUT)},
+            exception_retry_configuration=ExceptionRetryConfiguration(
+                errors=(aiohttp.ClientConnectionError, asyncio.TimeoutError, RetryableHTTPError),
+                retries=RPC_RETRIES,
+                backoff_factor=RPC_BACKOFF_FACTOR
+            ),
+            cache_allowed_requests=True,
+            cacheable_requests={"eth_chainId"}
+        )
+        # One pooled keep-alive session, so concurrent tool calls reuse TLS
+        # connections instead of reopening them
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=RPC_POOL_SIZE, limit_per_host=RPC_POOL_SIZE),
+            raise_for_status=_raise_for_retryable_status
+        )
+        await http_provider.cache_async_session(session)
+        provider = AsyncWeb3(http_provider)
+        
+        # Verify connection
+        if not await provider.is_connected():
+            raise ConnectionError(f"Could not connect to Ethereum node at {SEPOLIA_RPC_URL}")
+        logger.info(f"Connected to Ethereum node: {await provider.client_version}")
+        
+        # Initialize wallet
+        PRIVATE_KEY = os.getenv("PRIVATE_KEY")
+        if not PRIVATE_KEY:
+            logger.warning("Missing private key, using mock account")
+            # Generate a random private key for testing
+            PRIVATE_KEY = "0x" + secrets.token_hex(32)
+        
+        # Remove 0x prefix if present for account creation
+        if PRIVATE_KEY.startswith("0x"):
+            pk_for_account = PRIVATE_KEY[2:]
+        else:
+            pk_for_account = PRIVATE_KEY
+            PRIVATE_KEY = "0x" + PRIVATE_KEY
+            
+        account = provider.eth.account.from_key(pk_for_account)
+        wallet_address = account.address
+        logger.info(f"Using wallet address: {wallet_address}")
+        
+        # Read the chain ID, seed the local nonce counter and prime the fee data
+        # in one round trip; after this the only RPC sign_and_send_transaction
+        # needs is send_raw_transaction
+        chain_id, nonce, latest_block = await batch_rpc(provider, [
+            lambda: provider.eth.chain_id,
+            lambda: provider.eth.get_transaction_count(wallet_address, "pending"),
+            lambda: provider.eth.get_block("latest"),
+        ])
+        base_fee = latest_block.get("baseFeePerGas")
+        # Legacy chains fetch their gas price on the first submission instead
+        fees = transaction_fees(base_fee) if base_fee is not None else None
+        
+        # Initialize contract connections; built once per lifespan, bound to its provider
+        mcp_integration_contract = provider.eth.contract(address=MCP_INTEGRATION_ADDRESS, abi=MCP_INTEGRATION_ABI)
+        document_registry_contract = provider.eth.contract(address=DOCUMENT_REGISTRY_ADDRESS, abi=DOCUMENT_REGISTRY_ABI)
+        
+        # Create context
+        context = BlockchainContext(
+            provider=provider,
+            wallet_address=wallet_address,
+            private_key=PRIVATE_KEY,
+            mcp_integration_contract=mcp_integration_contract,
+            document_registry_contract=document_registry_contract,
+            chain_id=chain_id,
+            nonce=nonce,
+            fees=fees,
+            fees_ts=time.monotonic(),
+            receipt_poll_latency=receipt_poll_latency,
+            receipt_timeout=receipt_timeout,
+            is_live=True,
+            mcp_addr=mcp_integration_contract.address,
+            registry_addr=document_registry_contract.address
+        )
+        health_task = asyncio.create_task(refresh_liveness(context))
+        
+        logger.info("Blockchain connections initialized successfully")
+        yield context
+        
+    except ConnectionError as e:
+        logger.error(f"Connection error: {str(e)}")
+        raise
+    except ValueError as e:
+        logger.error(f"Value error: {str(e)}")
+        yield create_fallback_context()
+    except Exception as e:
+        logger.exception(f"Failed to initialize: {str(e)}")
+        yield create_fallback_context()
+    finally:
+        # Cleanup on shutdown
+        logger.info("Shutting down connections...")
+        if health_task is not None:
+            health_task.cancel()
+        if session is not None:
+            await session.close()
+
+async def refresh_liveness(blockchain_ctx, interval=HEALTH_CHECK_INTERVAL):
+    """Periodically re-check the node so is_live recovers after an outage"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            is_live = await blockchain_ctx.provider.is_connected()
+        except Exception as e:
+            # is_connected() only absorbs connection errors; an error status or a
+            # garbled response counts as unreachable, and the loop keeps running
+            logger.warning(f"Health check failed: {str(e)}")
+            is_live = False
+        if is_live != blockchain_ctx.is_live:
+            logger.info(f"Ethereum node is now {'reachable' if is_live else 'unreachable'}")
+        blockchain_ctx.is_live = is_live
+
+def create_fallback_context():
+    # Mock provider and contracts
+    from unittest.mock import MagicMock
+    mock_provider = MagicMock()
+    mock_contract = MagicMock()
+    
+    # Create a minimal context that won't cause attribute errors; is_live stays
+    # False so tools take their mock path
+    logger.info("Creating fallback context for testing")
+    context = BlockchainContext(
+        provider=mock_provider,
+        wallet_address="0x0000000000000000000000000000000000000000",
+        private_key="0x0000000000000000000000000000000000000000000000000000000000000000",
+        mcp_integration_contract=mock_contract,
+        document_registry_contract=mock_contract
+    )
+    
+    return context
+
+async def sign_and_send_transaction(call, blockchain_ctx):
+    """Helper function to properly sign and send a transaction
+    
+    call is a {'to': ..., 'data': ...} dict carrying pre-encoded calldata,
+    see the encode_* helpers.
+    """
+    try:
+        # Fee fields from the latest block, cached for about a block
+        fees = await blockchain_ctx.fees_cached()
+        
+        # Take the next nonce from the local counter instead of asking the node
+        nonce = await blockchain_ctx.next_nonce()
+        
+        try:
+            # Build transaction dictionary; the calldata is already encoded,
+            # so no ABI lookup or build_transaction round is needed
+            transaction = {
+                **call,
+                'from': blockchain_ctx.wallet_address,
+                'chainId': blockchain_ctx.chain_id,
+                'gas': 2000000,  # Gas limit
+                'nonce': nonce,
+                **fees,
+            }
+            
+            # Sign the transaction
+            signed_txn = blockchain_ctx.provider.eth.account.sign_transaction(
+                transaction, 
+                private_key=blockchain_ctx.private_key
+            )
+            
+            # Send the locally signed transaction; the node never needs the key
+            txn_hash = await blockchain_ctx.provider.eth.send_raw_transaction(signed_txn.raw_transaction)
+        except Exception as e:
+            if isinstance(e, (aiohttp.ClientConnectionError, asyncio.TimeoutError)):
+                # The node is unreachable; use mock results until the health check
+                # sees it again. Error statuses such as 429 mean it is up
+                blockchain_ctx.is_live = False
+            # The nonce was not consumed (nonce too low, replacement underpriced,
+            # node unreachable...), so reload it rather than leave a gap
+            await blockchain_ctx.resync_nonce()
+            raise
+        logger.info(f"Transaction sent: {txn_hash.hex()}")
+        
+        # Wait for transaction to be mined
+        try:
+            receipt = await wait_for_receipt(txn_hash, blockchain_ctx)
+        except TimeExhausted:
+            # The transaction may have been dropped or be stuck behind a gap;
+            # realign with the node's pending count for the next submission
+            await blockchain_ctx.resync_nonce()
+            raise
+        logger.info(f"Transaction confirmed in block {receipt.blockNumber}")
+        
+        return receipt
+        
+    except ValueError as e:
+        if "insufficient funds" in str(e).lower():
+            logger.error(f"Insufficient funds for transaction: {str(e)}")
+            raise ValueError(f"Wallet has insufficient funds: {str(e)}")
+        else:
+            logger.error(f"Transaction error: {str(e)}")
+            raise
+    except Exception as e:
+        logger.error(f"Transaction failed: {str(e)}")
+        raise
+
+# Random bytes for simulated IDs, refilled from os.urandom 4 KiB at a time
+_RAND_BUF = bytearray()
+_RAND_LOCK = threading.Lock()
+
+def fast_rand_hex(n_bytes: int) -> str:
+    """Return n_bytes of CSPRNG output as hex without a syscall per call"""
+    with _RAND_LOCK:
+        if len(_RAND_BUF) < n_bytes:
+            _RAND_BUF.extend(os.urandom(4096))
+        out = bytes(_RAND_BUF[-n_bytes:])
+        del _RAND_BUF[-n_bytes:]
+    return out.hex()
+
+def encode_request_document_generation(document_type: str, requirements: str) -> bytes:
+    """Calldata for requestDocumentGeneration(document_type, requirements)"""
+    type_tail = _abi_string_tail(document_type)
+    # Head: offsets of the two string tails (2 head words = 64 bytes)
+    return (
+        REQUEST_DOCUMENT_GENERATION_SELECTOR
+        + (64).to_bytes(32, "big")
+        + (64 + len(type_tail)).to_bytes(32, "big")
+        + type_tail
+        + _abi_string_tail(requirements)
+    )
+
+def encode_fulfill_document_request(request_id: int, document_content: str) -> bytes:
+    """Calldata for fulfillDocumentRequest(request_id, document_content, DOCUMENT_METADATA)"""
+    content_tail = _abi_string_tail(document_content)
+    # Head: the uint256 request ID, then offsets of the two string tails (3 head words = 96 bytes)
+    return (
+        FULFILL_DOCUMENT_REQUEST_SELECTOR
+        + request_id.to_bytes(32, "big")
+        + (96).to_bytes(32, "big")
+        + (96 + len(content_tail)).to_bytes(32, "big")
+        + content_tail
+        + DOCUMENT_METADATA_TAIL
+    )
+
+def encode_register_document(document_hash: bytes, document_type: str) -> bytes:
+    """Calldata for registerDocument(document_hash, document_type, DOCUMENT_METADATA)"""
+    type_tail = _abi_string_tail(document_type)
+    # Head: the bytes32 value, then offsets of the two string tails (3 head words = 96 bytes)
+    return (
+        REGISTER_DOCUMENT_SELECTOR
+        + document_hash
+        + (96).to_bytes(32, "big")
+        + (96 + len(type_tail)).to_bytes(32, "big")
+        + type_tail
+        + DOCUMENT_METADATA_TAIL
+    )
+
+def _document_id_bytes(document_id: str) -> bytes:
+    """Decode a document ID straight to the bytes32 value the registry expects
+    
+    Short IDs, with or without a 0x prefix, are right-padded with zeros to 32 bytes.
+    """
+    if len(document_id) == 66 and document_id.startswith("0x"):
+        # Full bytes32 hex, as returned by our own tools: nothing to pad
+        return bytes.fromhex(document_id[2:])
+    if document_id.startswith("0x"):
+        return bytes.fromhex(document_id[2:].ljust(64, '0'))
+    return bytes.fromhex(document_id.ljust(64, '0'))
+
+async def batch_rpc(provider, requests):
+    """Send several RPCs as a single JSON-RPC batch
+    
+    requests is a list of zero-argument callables each issuing one RPC.
+    Endpoints that reject batches get the calls sent concurrently instead.
+    """
+    payloads = []
+    try:
+        async with provider.batch_requests() as batch:
+            for request in requests:
+                payloads.append(request())
+                batch.add(payloads[-1])
+            return await batch.async_execute()
+    except Exception as e:
+        # The batch only awaits its coroutines once it executes; close any it
+        # never got to so they don't leak "never awaited" warnings
+        for payload in payloads:
+            if asyncio.iscoroutine(payload):
+                payload.close()
+        logger.warning(f"Batch request failed, sending calls individually: {str(e)}")
+        return await asyncio.gather(*(request() for request in requests))
+
+async def wait_for_receipt(txn_hash, blockchain_ctx):
+    """Wait for a transaction receipt, only asking for it when a new block arrives"""
+    eth = blockchain_ctx.provider.eth
+    try:
+        block_filter = await eth.filter("latest")
+    except Exception as e:
+        logger.warning(f"New block filter unavailable, polling for receipt: {str(e)}")
+        return await eth.wait_for_transaction_receipt(
+            txn_hash,
+            timeout=blockchain_ctx.receipt_timeout,
+            poll_latency=blockchain_ctx.receipt_poll_latency
+        )
+    
+    try:
+        deadline = time.monotonic() + blockchain_ctx.receipt_timeout
+        while True:
+            try:
+                return await eth.get_transaction_receipt(txn_hash)
+            except TransactionNotFound:
+                pass
+            
+            # Checked after every miss, so a chain that produces a block on each
+            # poll cannot keep a dropped transaction waiting forever
+            if time.monotonic() > deadline:
+                raise TimeExhausted(
+                    f"Transaction {txn_hash.hex()} not mined after {blockchain_ctx.receipt_timeout} seconds"
+                )
+            
+            # Nothing can change until the next block is produced; at the deadline,
+            # look up the receipt one last time
+            while not await block_filter.get_new_entries() and time.monotonic() <= deadline:
+                await asyncio.sleep(blockchain_ctx.receipt_poll_latency)
+    finally:
+        try:
+            await eth.uninstall_filter(block_filter.filter_id)
+        except Exception:
+            pass
+
+def build_document_content(document_type: str, requirements: str) -> str:
+    """Text of the generated document for the given type and requirements"""
+    return DOCUMENT_TEMPLATE.format(
+        document_type=document_type.upper(),
+        requirements=requirements
+    ).strip()
+
+def _build_and_hash_document(document_type: str, requirements: str):
+    # Runs in a worker thread: both steps are O(len(requirements))
+    document_content = build_document_content(document_type, requirements)
+    return document_content, _keccak_large(document_content)
+
+async def generate_legal_document(document_type: str, requirements: str, ctx: Context) -> dict:
+    """Generate a legal document and register it on Ethereum blockchain
+    
+    Args:
+        document_type: Type of legal document (e.g., NDA, Employment Contract)
+        requirements: Detailed requirements for the document
+    """
+    try:
+        # Access context (similar to server.context in JS); app_lifespan always
+        # yields a BlockchainContext, real or fallback
+        blockchain_ctx = ctx.request_context.lifespan_context
+        
+        logger.info(f"Generating {document_type} document")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Requirements: {requirements[:100]}...")
+        
+        # Generate document content based on requirements and hash it; large
+        # requirements are built and hashed in one worker thread hop
+        if len(requirements) > KECCAK_CACHE_INLINE_LIMIT:
+            document_content, document_hash_bytes = await asyncio.to_thread(
+                _build_and_hash_document, document_type, requirements
+            )
+        else:
+            document_content = build_document_content(document_type, requirements)
+            document_hash_bytes = await hash_document(document_content)
+        document_hash = Web3.to_hex(document_hash_bytes)
+        logger.info(f"Document hash: {document_hash}")
+        
+        try:
+            # Try to interact with the blockchain
+            logger.info("Attempting to register document on blockchain")
+            
+            # Check if we have a real connection
+            if blockchain_ctx.is_live:
+                # First request document generation via MCP
+                request_tx = {
+                    'to': blockchain_ctx.mcp_addr,
+                    'data': encode_request_document_generation(document_type, requirements),
+                }
+                
+                receipt = await sign_and_send_transaction(request_tx, blockchain_ctx)
+                
+                # Extract request ID from the DocumentGenerationRequested event;
+                # the signature topic rules out unrelated logs before any decoding.
+                # The last matching log wins, so scan backwards and stop there
+                request_id = 1  # Default fallback
+                for log in reversed(receipt.logs):
+                    if log.topics and log.topics[0] == DOCUMENT_GENERATION_REQUESTED_TOPIC and log.address == blockchain_ctx.mcp_addr:
+                        # topics[1] is the indexed requestId
+                        request_id = int.from_bytes(log.topics[1], "big")
+                        break
+                
+                logger.info(f"Document generation requested with ID: {request_id}")
+                
+                # In a real scenario, you'd wait for Claude to generate the document
+                # Here we'll use our pre-generated content and fulfill the request
+                
+                # Fulfill the request with the document
+                fulfill_tx = {
+                    'to': blockchain_ctx.mcp_addr,
+                    'data': encode_fulfill_document_request(request_id, document_content),
+                }
+                
+                receipt = await sign_and_send_transaction(fulfill_tx, blockchain_ctx)
+                
+                # Extract document ID from the DocumentGenerationFulfilled event
+                document_id = "0x" + fast_rand_hex(12)  # Default fallback
+                for log in reversed(receipt.logs):
+                    if log.topics and log.topics[0] == DOCUMENT_GENERATION_FULFILLED_TOPIC and log.address == blockchain_ctx.mcp_addr:
+                        # documentId is not indexed; it is the first word of the data
+                        document_id = Web3.to_hex(log.data[:32])
+                        break
+                
+                logger.info(f"Document registered on blockchain with ID: {document_id}")
+                
+            else:
+                logger.warning("Using mock blockchain interaction")
+                document_id = "0x" + fast_rand_hex(12)
+                
+        except ValueError as e:
+            logger.error(f"Blockchain value error: {str(e)}")
+            raise
+        except Exception as blockchain_error:
+            logger.exception(f"Blockchain interaction failed: {str(blockchain_error)}")
+            document_id = "0x" + fast_rand_hex(12)
+            logger.info(f"Using simulated document ID: {document_id}")
+        
+        return {
+            "success": True,
+            "document_id": document_id,
+            "document_content": document_content,
+            "document_hash": document_hash,
+            "message": f"Document generated and registered with ID: {document_id}"
+        }
+    except ValueError as e:
+        logger.error(f"Value error: {str(e)}")
+        return {
+            "success": False,
+            "message": f"Error generating document: {str(e)}"
+        }
+    except Exception as e:
+        logger.exception(f"Error generating document: {str(e)}")
+        
+        return {
+            "success": False,
+            "message": f"Error generating document: {str(e)}"
+        }
+
+async def register_legal_document(document_id: str, document_content: str, document_type: str, ctx: Context) -> dict:
+    """Register a legal document on the Ethereum blockchain
+    
+    Args:
+        document_id: ID or reference for the document
+        document_content: The full text content of the document
+        document_type: Type of legal document (e.g., NDA, Employment Contract)
+    """
+    try:
+        # Access context; app_lifespan always yields a BlockchainContext
+        blockchain_ctx = ctx.request_context.lifespan_context
+        
+        # Calculate document hash; keep the raw bytes and format hex once for output
+        document_hash_bytes = await hash_document(document_content)
+        document_hash = Web3.to_hex(document_hash_bytes)
+        logger.info(f"Registering document with ID: {document_id}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Calculated hash: {document_hash}")
+        
+        try:
+            # Try to interact with the blockchain
+            logger.info("Attempting to register document on blockchain")
+            
+            # If we have a real connection, register the document
+            if blockchain_ctx.is_live:
+                # Register document on the blockchain
+                register_tx = {
+                    'to': blockchain_ctx.registry_addr,
+                    'data': encode_register_document(document_hash_bytes, document_type),
+                }
+                
+                # Sign and send the transaction
+                receipt = await sign_and_send_transaction(register_tx, blockchain_ctx)
+                
+                # Extract document ID from the DocumentRegistered event
+                blockchain_document_id = None
+                for log in reversed(receipt.logs):
+                    if log.topics and log.topics[0] == DOCUMENT_REGISTERED_TOPIC and log.address == blockchain_ctx.registry_addr:
+                        # topics[1] is the indexed owner, topics[2] the documentId
+                        blockchain_document_id = Web3.to_hex(log.topics[2])
+                        break
+                
+                if blockchain_document_id:
+                    document_id = blockchain_document_id
+                
+                logger.info(f"Document registered with blockchain ID: {document_id}")
+                
+                return {
+                    "success": True,
+                    "document_id": document_id,
+                    "document_hash": document_hash,
+                    "transaction_hash": Web3.to_hex(receipt.transactionHash),
+                    "message": "Document successfully registered on the blockchain"
+                }
+            else:
+                logger.warning("Using mock registration")
+                # Create a mock document ID for testing
+                mock_document_id = "0x" + fast_rand_hex(12)
+                
+                return {
+                    "success": True,
+                    "document_id": mock_document_id,
+                    "document_hash": document_hash,
+                    "transaction_hash": "0x" + fast_rand_hex(16),
+                    "message": "Document successfully registered (simulated)"
+                }
+                
+        except Exception as blockchain_error:
+            logger.exception(f"Blockchain registration failed: {str(blockchain_error)}")
+            return {
+                "success": False,
+                "message": f"Error registering document: {str(blockchain_error)}"
+            }
+        
+    except Exception as e:
+        logger.exception(f"Error registering document: {str(e)}")
+        
+        return {
+            "success": False,
+            "message": f"Error registering document: {str(e)}"
+        }
+
+async def verify_document(document_id: str, document_content: str, ctx: Context) -> dict:
+    """Verify a document's authenticity on the Ethereum blockchain
+    
+    Args:
+        document_id: ID of the document to verify
+        document_content: Content of the document to verify
+    """
+    try:
+        # Access context; app_lifespan always yields a BlockchainContext
+        blockchain_ctx = ctx.request_context.lifespan_context
+        
+        # Calculate document hash; keep the raw bytes and format hex once for output
+        document_hash_bytes = await hash_document(document_content)
+        document_hash = Web3.to_hex(document_hash_bytes)
+        logger.info(f"Verifying document with ID: {document_id}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Calculated hash: {document_hash}")
+        
+        # No simulated results: a check that cannot reach the chain reports
+        # failure rather than authenticity
+        if not blockchain_ctx.is_live:
+            logger.warning("Blockchain unavailable, cannot verify document")
+            return {
+                "success": False,
+                "verified": False,
+                "document_id": document_id,
+                "document_hash": document_hash,
+                "message": "Error verifying document: blockchain connection unavailable"
+            }
+        
+        try:
+            # Try to interact with the blockchain
+            logger.info("Attempting to verify document on blockchain")
+            
+            # Format parameters properly
+            document_id_bytes = _document_id_bytes(document_id)
+            
+            cache_key = (blockchain_ctx.registry_addr, document_id_bytes, document_hash_bytes)
+            verified = _verify_cache_get(cache_key)
+            if verified is None:
+                # Call the verify function
+                # Note: This is a view function, so no transaction needed
+                result = await blockchain_ctx.provider.eth.call({
+                    'to': blockchain_ctx.registry_addr,
+                    'data': VERIFY_DOCUMENT_SELECTOR + abi_encode(
+                        ["bytes32", "bytes32"],
+                        [document_id_bytes, document_hash_bytes]
+                    ),
+                })
+                verified = abi_decode(["bool"], result)[0]
+                _verify_cache_put(cache_key, verified)
+            
+            logger.info(f"Document verification result: {verified}")
+        except ContractLogicError as e:
+            # Reverted, e.g. DocumentNotFound for an unknown ID: unverified and not cached
+            logger.warning(f"Document verification reverted: {str(e)}")
+            return {
+                "success": True,
+                "verified": False,
+                "document_id": document_id,
+                "document_hash": document_hash,
+                "message": f"Document verification failed: {str(e)}"
+            }
+        except Exception as blockchain_error:
+            logger.exception(f"Blockchain verification failed: {str(blockchain_error)}")
+            return {
+                "success": False,
+                "verified": False,
+                "document_id": document_id,
+                "document_hash": document_hash,
+                "message": f"Error verifying document: {str(blockchain_error)}"
+            }
+        
+        return {
+            "success": True,
+            "verified": verified,
+            "document_id": document_id,
+            "document_hash": document_hash,
+            "message": "Document is authentic and unaltered." if verified else 
+                     "Document verification failed. The document may have been altered."
+        }
+    except ValueError as e:
+        logger.error(f"Value error: {str(e)}")
+        return {
+            "success": False,
+            "verified": False,
+            "message": f"Error verifying document: {str(e)}"
+        }
+    except Exception as e:
+        logger.exception(f"Error verifying document: {str(e)}")
+        
+        return {
+            "success": False,
+            "verified": False,
+            "message": f"Error verifying document: {str(e)}"
+        }
+
+async def verify_many(blockchain_ctx, calls):
+    """Run verifyDocument calldata for several documents
+    
+    Returns one entry per call: the verifyDocument result, or None where the
+    call reverted (e.g. DocumentNotFound). All calls go out as a single
+    Multicall3 aggregate3 eth_call; where Multicall3 is not deployed they are
+    sent concurrently, one eth_call each.
+    """
+    eth = blockchain_ctx.provider.eth
+    registry_address = blockchain_ctx.registry_addr
+    try:
+        result = await eth.call({
+            'to': MULTICALL3_ADDRESS,
+            'data': AGGREGATE3_SELECTOR + abi_encode(
+                ["(address,bool,bytes)[]"],
+                [[(registry_address, True, data) for data in calls]]
+            ),
+        })
+        return [
+            abi_decode(["bool"], return_data)[0] if success else None
+            for success, return_data in abi_decode(["(bool,bytes)[]"], result)[0]
+        ]
+    except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+        # The node is unreachable; the per-call fallback would fail the same way
+        raise
+    except Exception as e:
+        logger.warning(f"Multicall3 aggregate failed, verifying documents one call each: {str(e)}")
+    
+    # A JSON-RPC batch fails as a whole when any entry reverts, so the calls go
+    # out separately and each revert is reported on its own
+    results = await asyncio.gather(
+        *(eth.call({'to': registry_address, 'data': data}) for data in calls),
+        return_exceptions=True
+    )
+    verified = []
+    for result in results:
+        if isinstance(result, ContractLogicError):
+            verified.append(None)
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            verified.append(abi_decode(["bool"], result)[0])
+    return verified
+
+async def verify_documents(documents: list[dict[str, str]], ctx: Context) -> dict:
+    """Verify several documents' authenticity on the Ethereum blockchain in one call
+    
+    Args:
+        documents: Documents to verify, each with document_id and document_content
+    """
+    try:
+        # Access context; app_lifespan always yields a BlockchainContext
+        blockchain_ctx = ctx.request_context.lifespan_context
+        
+        # No simulated results: a bulk check that cannot reach the chain
+        # reports failure rather than authenticity
+        if not blockchain_ctx.is_live:
+            logger.warning("Blockchain unavailable, cannot verify documents")
+            return {
+                "success": False,
+                "message": "Error verifying documents: blockchain connection unavailable"
+            }
+        
+        logger.info(f"Verifying {len(documents)} documents")
+        results = []
+        # Documents whose result is not cached: (result entry, cache key, calldata)
+        pending = []
+        for document in documents:
+            document_hash_bytes = await hash_document(document["document_content"])
+            document_id_bytes = _document_id_bytes(document["document_id"])
+            cache_key = (blockchain_ctx.registry_addr, document_id_bytes, document_hash_bytes)
+            verified = _verify_cache_get(cache_key)
+            result = {
+                "document_id": document["document_id"],
+                "document_hash": Web3.to_hex(document_hash_bytes),
+                "verified": bool(verified)  # Unverified until the chain says otherwise
+            }
+            results.append(result)
+            if verified is None:
+                pending.append((result, cache_key, VERIFY_DOCUMENT_SELECTOR + abi_encode(
+                    ["bytes32", "bytes32"],
+                    [document_id_bytes, document_hash_bytes]
+                )))
+        
+        # Any failure other than a per-document revert propagates, so the tool
+        # reports success: False instead of unchecked results
+        if pending:
+            verified_list = await verify_many(blockchain_ctx, [calldata for _, _, calldata in pending])
+            for (result, cache_key, _), verified in zip(pending, verified_list):
+                if verified is None:
+                    # Reverted, e.g. unknown document ID: unverified and not cached
+                    continue
+                result["verified"] = verified
+                _verify_cache_put(cache_key, verified)
+        
+        verified_count = sum(r["verified"] for r in results)
+        logger.info(f"Verified {verified_count} of {len(results)} documents")
+        return {
+            "success": True,
+            "results": results,
+            "message": f"{verified_count} of {len(results)} documents are authentic and unaltered."
+        }
+    except Exception as e:
+        logger.exception(f"Error verifying documents: {str(e)}")
+        
+        return {
+            "success": False,
+            "message": f"Error verifying documents: {str(e)}"
+        }
+
+async def fetch_registered_documents(blockchain_ctx):
+    """Read the documents the wallet registered itself, batching the per-document calls"""
+    eth = blockchain_ctx.provider.eth
+    registry_address = blockchain_ctx.registry_addr
+    
+    # getUserDocuments and getDocument answer for msg.sender, so call as our wallet
+    def registry_call(data):
+        return lambda: eth.call({
+            'from': blockchain_ctx.wallet_address,
+            'to': registry_address,
+            'data': data,
+        })
+    
+    result = await registry_call(GET_USER_DOCUMENTS_SELECTOR)()
+    document_ids = abi_decode(["bytes32[]"], result)[0]
+    logger.info(f"Found {len(document_ids)} registered documents")
+    
+    # Fetch every document's details in one round trip
+    results = await batch_rpc(blockchain_ctx.provider, [
+        registry_call(GET_DOCUMENT_SELECTOR + abi_encode(["bytes32"], [document_id]))
+        for document_id in document_ids
+    ]) if document_ids else []
+    
+    documents = []
+    for document_id, raw in zip(document_ids, results):
+        owner, document_hash, timestamp, document_type, metadata = abi_decode(
+            GET_DOCUMENT_OUTPUT_TYPES, raw
+        )
+        documents.append({
+            "document_id": Web3.to_hex(document_id),
+            "document_type": document_type,
+            "owner": owner,
+            "document_hash": Web3.to_hex(document_hash),
+            "timestamp": timestamp,
+            "metadata": metadata
+        })
+    return documents
+
+async def list_documents(ctx: Context) -> dict:
+    """List the documents registered on the Ethereum blockchain directly by this server's wallet
+    
+    Only documents registered with register_legal_document are listed. Documents
+    from generate_legal_document are registered through the MCPIntegration
+    contract, which owns them in the registry, so they do not appear here.
+    """
+    try:
+        # Access context; app_lifespan always yields a BlockchainContext
+        blockchain_ctx = ctx.request_context.lifespan_context
+        
+        if blockchain_ctx.is_live:
+            documents = await fetch_registered_documents(blockchain_ctx)
+        else:
+            logger.warning("Using mock document list")
+            documents = []
+        
+        return {
+            "success": True,
+            "documents": documents,
+            "message": f"Found {len(documents)} documents registered directly by this wallet "
+                       "(documents from generate_legal_document are owned by the MCPIntegration contract and not listed)"
+        }
+    except Exception as e:
+        logger.exception(f"Error listing documents: {str(e)}")
+        
+        return {
+            "success": False,
+            "message": f"Error listing documents: {str(e)}"
+        }
+
+def create_server() -> FastMCP:
+    """Create the MCP server with every document tool registered"""
+    # Create MCP server with name, dependencies and lifespan; the lifespan has to be
+    # passed here, FastMCP only wires it into the low-level server at construction.
+    # The dependencies cover every top-level import plus the optional speedups
+    # (orjson, uvloop), so `mcp install` / `mcp dev` environments get them too
+    server = FastMCP(
+        "ethereum-legal-docs",
+        dependencies=[
+            "web3",
+            "python-dotenv",
+            "aiohttp",
+            "pycryptodome",
+            "orjson",
+            "uvloop; sys_platform != 'win32'"
+        ],
+        lifespan=app_lifespan
+    )
+    
+    for tool in (generate_legal_document, register_legal_document, verify_document, verify_documents, list_documents):
+        server.add_tool(tool)
+    
+    return server
@@ -1,529 +1,8 @@
 # mcp_server.py
-from mcp.server.fastmcp import FastMCP, Context
-from contextlib import asynccontextmanager
-from collections.abc import AsyncIterator
-from dataclasses import dataclass
-import os
-from web3 import Web3
-from dotenv import load_dotenv
-import uuid
-import traceback
-import logging
-import json
+from _mcp_common import create_server
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='[%(asctime)s] [%(name)s] [%(levelname)s] %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("mcp_server.log")
-    ]
-)
-logger = logging.getLogger("ethereum-legal-docs")
-
-# Load environment variables
-load_dotenv()
-
-@dataclass
-class BlockchainContext:
-    provider: Web3
-    wallet_address: str
-    private_key: str  # Added to sign transactions
-    mcp_integration_contract: any
-    document_registry_contract: any
-
-@asynccontextmanager
-async def app_lifespan(server: FastMCP) -> AsyncIterator[BlockchainContext]:
-    """Manage application lifecycle with blockchain connections"""
-    # Initialize on startup
-    logger.info("Initializing blockchain connections...")
-    
-    try:
-        # Load contract addresses from environment
-        DOCUMENT_REGISTRY_ADDRESS = os.getenv("DOCUMENT_REGISTRY_ADDRESS")
-        MCP_INTEGRATION_ADDRESS = os.getenv("MCP_INTEGRATION_ADDRESS")
-        
-        if not DOCUMENT_REGISTRY_ADDRESS or not MCP_INTEGRATION_ADDRESS:
-            logger.warning("Missing contract addresses, using mock values for testing")
-            DOCUMENT_REGISTRY_ADDRESS = "0x0000000000000000000000000000000000000000"
-            MCP_INTEGRATION_ADDRESS = "0x0000000000000000000000000000000000000000"
-        
-        # Initialize provider
-        SEPOLIA_RPC_URL = os.getenv("SEPOLIA_RPC_URL")
-        if not SEPOLIA_RPC_URL:
-            logger.warning("Missing RPC URL, using default Infura endpoint")
-            SEPOLIA_RPC_URL = "https://sepolia.infura.io/v3/9aa3d95b3bc440fa88ea12eaa4456161"
-            
-        provider = Web3(Web3.HTTPProvider(SEPOLIA_RPC_URL))
-        
-        # Verify connection
-        if not provider.is_connected():
-            raise ConnectionError(f"Could not connect to Ethereum node at {SEPOLIA_RPC_URL}")
-        logger.info(f"Connected to Ethereum node: {provider.client_version}")
-        
-        # Initialize wallet
-        PRIVATE_KEY = os.getenv("PRIVATE_KEY")
-        if not PRIVATE_KEY:
-            logger.warning("Missing private key, using mock account")
-            # Generate a random private key for testing
-            import secrets
-            PRIVATE_KEY = "0x" + secrets.token_hex(32)
-        
-        # Remove 0x prefix if present for account creation
-        if PRIVATE_KEY.startswith("0x"):
-            pk_for_account = PRIVATE_KEY[2:]
-        else:
-            pk_for_account = PRIVATE_KEY
-            PRIVATE_KEY = "0x" + PRIVATE_KEY
-            
-        account = provider.eth.account.from_key(pk_for_account)
-        wallet_address = account.address
-        logger.info(f"Using wallet address: {wallet_address}")
-        
-        # Initialize contract connections
-        mcp_integration_abi = [
-            {"inputs": [{"type": "string"}, {"type": "string"}], "name": "requestDocumentGeneration", "outputs": [{"type": "uint256"}], "stateMutability": "nonpayable", "type": "function"},
-            {"inputs": [{"type": "uint256"}, {"type": "string"}, {"type": "string"}], "name": "fulfillDocumentRequest", "outputs": [], "stateMutability": "nonpayable", "type": "function"},
-            {"inputs": [{"type": "uint256"}, {"type": "string"}], "name": "receiveAIResponse", "outputs": [], "stateMutability": "nonpayable", "type": "function"}
-        ]
-        
-        document_registry_abi = [
-            {"inputs": [{"type": "bytes32"}, {"type": "string"}, {"type": "string"}], "name": "registerDocument", "outputs": [{"type": "bytes32"}], "stateMutability": "nonpayable", "type": "function"},
-            {"inputs": [{"type": "bytes32"}, {"type": "bytes32"}], "name": "verifyDocument", "outputs": [{"type": "bool"}], "stateMutability": "view", "type": "function"}
-        ]
-        
-        mcp_integration_contract = provider.eth.contract(
-            address=MCP_INTEGRATION_ADDRESS,
-            abi=mcp_integration_abi
-        )
-        
-        document_registry_contract = provider.eth.contract(
-            address=DOCUMENT_REGISTRY_ADDRESS,
-            abi=document_registry_abi
-        )
-        
-        # Create context
-        context = BlockchainContext(
-            provider=provider,
-            wallet_address=wallet_address,
-            private_key=PRIVATE_KEY,
-            mcp_integration_contract=mcp_integration_contract,
-            document_registry_contract=document_registry_contract
-        )
-        
-        logger.info("Blockchain connections initialized successfully")
-        yield context
-        
-    except ConnectionError as e:
-        logger.error(f"Connection error: {str(e)}")
-        raise
-    except ValueError as e:
-        logger.error(f"Value error: {str(e)}")
-        yield create_fallback_context()
-    except Exception as e:
-        logger.error(f"Failed to initialize: {str(e)}")
-        traceback.print_exc()
-        yield create_fallback_context()
-    finally:
-        # Cleanup on shutdown
-        logger.info("Shutting down connections...")
-
-def create_fallback_context():
-    # Mock provider and contracts
-    from unittest.mock import MagicMock
-    mock_provider = MagicMock()
-    mock_contract = MagicMock()
-    
-    # Create a minimal context that won't cause attribute errors
-    logger.info("Creating fallback context for testing")
-    context = BlockchainContext(
-        provider=mock_provider,
-        wallet_address="0x0000000000000000000000000000000000000000",
-        private_key="0x0000000000000000000000000000000000000000000000000000000000000000",
-        mcp_integration_contract=mock_contract,
-        document_registry_contract=mock_contract
-    )
-    
-    return context
-
-# Create MCP server with name and dependencies
-server = FastMCP("ethereum-legal-docs", dependencies=["web3", "python-dotenv"])
-
-# Set up lifespan
-server.lifespan = app_lifespan
-
-def sign_and_send_transaction(contract_function, blockchain_ctx):
-    """Helper function to properly sign and send a transaction"""
-    try:
-        # Get the current gas price with a small multiplier for faster confirmation
-        gas_price = int(blockchain_ctx.provider.eth.gas_price * 1.1)
-        
-        # Get the transaction count/nonce
-        nonce = blockchain_ctx.provider.eth.get_transaction_count(blockchain_ctx.wallet_address)
-        
-        # Build transaction dictionary
-        transaction = contract_function.build_transaction({
-            'chainId': blockchain_ctx.provider.eth.chain_id,
-            'gas': 2000000,  # Gas limit
-            'gasPrice': gas_price,
-            'nonce': nonce,
-        })
-        
-        # Sign the transaction
-        signed_txn = blockchain_ctx.provider.eth.account.sign_transaction(
-            transaction, 
-            private_key=blockchain_ctx.private_key
-        )
-        
-        # Send the transaction
-        txn_hash = blockchain_ctx.provider.eth.send_raw_transaction(signed_txn.rawTransaction)
-        logger.info(f"Transaction sent: {txn_hash.hex()}")
-        
-        # Wait for transaction to be mined
-        receipt = blockchain_ctx.provider.eth.wait_for_transaction_receipt(txn_hash)
-        logger.info(f"Transaction confirmed in block {receipt.blockNumber}")
-        
-        return receipt
-        
-    except ValueError as e:
-        if "insufficient funds" in str(e).lower():
-            logger.error(f"Insufficient funds for transaction: {str(e)}")
-            raise ValueError(f"Wallet has insufficient funds: {str(e)}")
-        else:
-            logger.error(f"Transaction error: {str(e)}")
-            raise
-    except Exception as e:
-        logger.error(f"Transaction failed: {str(e)}")
-        raise
-
-@server.tool()
-async def generate_legal_document(document_type: str, requirements: str, ctx: Context) -> dict:
-    """Generate a legal document and register it on Ethereum blockchain
-    
-    Args:
-        document_type: Type of legal document (e.g., NDA, Employment Contract)
-        requirements: Detailed requirements for the document
-    """
-    try:
-        # Debug the context object
-        logger.info(f"Context received: {ctx}")
-        logger.info(f"Has lifespan_context: {hasattr(ctx.request_context, 'lifespan_context')}")
-        
-        # Access context (similar to server.context in JS)
-        if not hasattr(ctx.request_context, 'lifespan_context'):
-            raise ValueError("Lifespan context not initialized")
-            
-        blockchain_ctx = ctx.request_context.lifespan_context
-        logger.info(f"Blockchain context attributes: {dir(blockchain_ctx)}")
-        
-        # Check if the context has the required attributes
-        if hasattr(blockchain_ctx, 'mcp_integration_contract'):
-            logger.info("MCP integration contract found in context")
-        else:
-            logger.error("MCP integration contract missing from context")
-            raise ValueError("MCP integration contract not initialized in context")
-            
-        logger.info(f"Generating {document_type} document")
-        logger.debug(f"Requirements: {requirements[:100]}...")
-        
-        # Generate document content based on requirements
-        document_content = f"""
-        {document_type.upper()}
-        
-        Based on the following requirements:
-        {requirements}
-        
-        [Document content would be generated here in production]
-        """
-        
-        # Calculate document hash
-        document_hash = Web3.keccak(text=document_content).hex()
-        logger.info(f"Document hash: {document_hash}")
-        
-        try:
-            # Try to interact with the blockchain
-            logger.info("Attempting to register document on blockchain")
-            
-            # Check if we have a real connection
-            if blockchain_ctx.provider.is_connected():
-                # First request document generation via MCP
-                request_fn = blockchain_ctx.mcp_integration_contract.functions.requestDocumentGeneration(
-                    document_type,
-                    requirements
-                )
-                
-                receipt = sign_and_send_transaction(request_fn, blockchain_ctx)
-                
-                # Extract request ID from event logs
-                # This is simplified - in production you'd parse the event properly
-                request_id = 1  # Default fallback
-                for log in receipt.logs:
-                    # Basic parsing - would be more robust in production
-                    if len(log.topics) > 1 and log.address.lower() == blockchain_ctx.mcp_integration_contract.address.lower():
-                        # Assuming first topic is event signature and second is requestId
-                        request_id = int(log.topics[1].hex(), 16)
-                
-                logger.info(f"Document generation requested with ID: {request_id}")
-                
-                # In a real scenario, you'd wait for Claude to generate the document
-                # Here we'll use our pre-generated content and fulfill the request
-                
-                # Fulfill the request with the document
-                fulfill_fn = blockchain_ctx.mcp_integration_contract.functions.fulfillDocumentRequest(
-                    request_id,
-                    document_content,
-                    "Generated via Claude MCP"
-                )
-                
-                receipt = sign_and_send_transaction(fulfill_fn, blockchain_ctx)
-                
-                # Extract document ID from event logs
-                document_id = "0x" + uuid.uuid4().hex[:24]  # Default fallback
-                for log in receipt.logs:
-                    # Basic parsing - would be more robust in production
-                    if len(log.topics) > 1 and log.address.lower() == blockchain_ctx.mcp_integration_contract.address.lower():
-                        # Assuming first topic is event signature and second is documentId
-                        document_id = log.topics[1].hex()
-                
-                logger.info(f"Document registered on blockchain with ID: {document_id}")
-                
-            else:
-                logger.warning("Using mock blockchain interaction")
-                document_id = "0x" + uuid.uuid4().hex[:24]
-                
-        except ValueError as e:
-            logger.error(f"Blockchain value error: {str(e)}")
-            raise
-        except Exception as blockchain_error:
-            logger.error(f"Blockchain interaction failed: {str(blockchain_error)}")
-            logger.error(traceback.format_exc())
-            document_id = "0x" + uuid.uuid4().hex[:24]
-            logger.info(f"Using simulated document ID: {document_id}")
-        
-        return {
-            "success": True,
-            "document_id": document_id,
-            "document_content": document_content,
-            "document_hash": document_hash,
-            "message": f"Document generated and registered with ID: {document_id}"
-        }
-    except ValueError as e:
-        logger.error(f"Value error: {str(e)}")
-        return {
-            "success": False,
-            "message": f"Error generating document: {str(e)}"
-        }
-    except Exception as e:
-        logger.error(f"Error generating document: {str(e)}")
-        logger.error(traceback.format_exc())
-        
-        return {
-            "success": False,
-            "message": f"Error generating document: {str(e)}"
-        }
-
-@server.tool()
-async def register_legal_document(document_id: str, document_content: str, document_type: str, ctx: Context) -> dict:
-    """Register a legal document on the Ethereum blockchain
-    
-    Args:
-        document_id: ID or reference for the document
-        document_content: The full text content of the document
-        document_type: Type of legal document (e.g., NDA, Employment Contract)
-    """
-    try:
-        # Debug the context object
-        logger.info(f"Context received for registration: {ctx}")
-        logger.info(f"Has lifespan_context: {hasattr(ctx.request_context, 'lifespan_context')}")
-        
-        # Access context safely
-        if not hasattr(ctx.request_context, 'lifespan_context'):
-            raise ValueError("Lifespan context not initialized")
-            
-        blockchain_ctx = ctx.request_context.lifespan_context
-        logger.info(f"Blockchain context attributes: {dir(blockchain_ctx)}")
-        
-        # Check if the context has the required attributes
-        if hasattr(blockchain_ctx, 'document_registry_contract'):
-            logger.info("Document registry contract found in context")
-        else:
-            logger.error("Document registry contract missing from context")
-            raise ValueError("Document registry contract not initialized in context")
-        
-        # Calculate document hash
-        document_hash = Web3.keccak(text=document_content).hex()
-        logger.info(f"Registering document with ID: {document_id}")
-        logger.debug(f"Calculated hash: {document_hash}")
-        
-        try:
-            # Try to interact with the blockchain
-            logger.info("Attempting to register document on blockchain")
-            
-            # If we have a real connection, register the document
-            if blockchain_ctx.provider.is_connected():
-                # Format parameters properly
-                document_hash_bytes = Web3.to_bytes(hexstr=document_hash)
-                
-                # Register document on the blockchain
-                register_fn = blockchain_ctx.document_registry_contract.functions.registerDocument(
-                    document_hash_bytes,
-                    document_type,
-                    "Generated via Claude MCP"
-                )
-                
-                # Sign and send the transaction
-                receipt = sign_and_send_transaction(register_fn, blockchain_ctx)
-                
-                # Extract document ID from logs
-                blockchain_document_id = None
-                for log in receipt.logs:
-                    if len(log.topics) > 1 and log.address.lower() == blockchain_ctx.document_registry_contract.address.lower():
-                        blockchain_document_id = log.topics[1].hex()
-                        break
-                
-                if blockchain_document_id:
-                    document_id = blockchain_document_id
-                
-                logger.info(f"Document registered with blockchain ID: {document_id}")
-                
-                return {
-                    "success": True,
-                    "document_id": document_id,
-                    "document_hash": document_hash,
-                    "transaction_hash": receipt.transactionHash.hex(),
-                    "message": "Document successfully registered on the blockchain"
-                }
-            else:
-                logger.warning("Using mock registration")
-                # Create a mock document ID for testing
-                mock_document_id = "0x" + uuid.uuid4().hex[:24]
-                
-                return {
-                    "success": True,
-                    "document_id": mock_document_id,
-                    "document_hash": document_hash,
-                    "transaction_hash": "0x" + uuid.uuid4().hex,
-                    "message": "Document successfully registered (simulated)"
-                }
-                
-        except Exception as blockchain_error:
-            logger.error(f"Blockchain registration failed: {str(blockchain_error)}")
-            logger.error(traceback.format_exc())
-            return {
-                "success": False,
-                "message": f"Error registering document: {str(blockchain_error)}"
-            }
-        
-    except Exception as e:
-        logger.error(f"Error registering document: {str(e)}")
-        logger.error(traceback.format_exc())
-        
-        return {
-            "success": False,
-            "message": f"Error registering document: {str(e)}"
-        }
-
-@server.tool()
-async def verify_document(document_id: str, document_content: str, ctx: Context) -> dict:
-    """Verify a document's authenticity on the Ethereum blockchain
-    
-    Args:
-        document_id: ID of the document to verify
-        document_content: Content of the document to verify
-    """
-    try:
-        # Debug the context object
-        logger.info(f"Context received for verification: {ctx}")
-        logger.info(f"Has lifespan_context: {hasattr(ctx.request_context, 'lifespan_context')}")
-        
-        # Access context safely
-        if not hasattr(ctx.request_context, 'lifespan_context'):
-            raise ValueError("Lifespan context not initialized")
-            
-        blockchain_ctx = ctx.request_context.lifespan_context
-        logger.info(f"Blockchain context attributes: {dir(blockchain_ctx)}")
-        
-        # Check if the context has the required attributes
-        if hasattr(blockchain_ctx, 'document_registry_contract'):
-            logger.info("Document registry contract found in context")
-        else:
-            logger.error("Document registry contract missing from context")
-            raise ValueError("Document registry contract not initialized in context")
-        
-        # Calculate document hash
-        document_hash = Web3.keccak(text=document_content).hex()
-        logger.info(f"Verifying document with ID: {document_id}")
-        logger.debug(f"Calculated hash: {document_hash}")
-        
-        # Format document ID if needed
-        if document_id.startswith("0x"):
-            formatted_document_id = document_id
-        else:
-            # Convert to bytes32
-            formatted_document_id = "0x" + document_id.ljust(64, '0')
-        
-        try:
-            # Try to interact with the blockchain
-            logger.info("Attempting to verify document on blockchain")
-            
-            # Simulate verification result for testing
-            verified = True  # Default for testing
-            
-            # If we have a real connection, try to verify
-            if blockchain_ctx.provider.is_connected():
-                # Format parameters properly
-                document_id_bytes = Web3.to_bytes(hexstr=formatted_document_id)
-                document_hash_bytes = Web3.to_bytes(hexstr=document_hash)
-                
-                # Call the verify function
-                # Note: This is a view function, so no transaction needed
-                verified = blockchain_ctx.document_registry_contract.functions.verifyDocument(
-                    document_id_bytes,
-                    document_hash_bytes
-                ).call()
-                
-                logger.info(f"Document verification result: {verified}")
-            else:
-                logger.warning("Using mock verification result")
-        except ValueError as e:
-            logger.error(f"Blockchain verification value error: {str(e)}")
-            if "execution reverted" in str(e).lower():
-                return {
-                    "success": False,
-                    "verified": False,
-                    "document_id": document_id,
-                    "document_hash": document_hash,
-                    "message": f"Document verification failed: {str(e)}"
-                }
-            raise
-        except Exception as blockchain_error:
-            logger.error(f"Blockchain verification failed: {str(blockchain_error)}")
-            logger.error(traceback.format_exc())
-            logger.info("Using simulated verification result")
-        
-        return {
-            "success": True,
-            "verified": verified,
-            "document_id": document_id,
-            "document_hash": document_hash,
-            "message": "Document is authentic and unaltered." if verified else 
-                     "Document verification failed. The document may have been altered."
-        }
-    except ValueError as e:
-        logger.error(f"Value error: {str(e)}")
-        return {
-            "success": False,
-            "message": f"Error verifying document: {str(e)}"
-        }
-    except Exception as e:
-        logger.error(f"Error verifying document: {str(e)}")
-        logger.error(traceback.format_exc())
-        
-        return {
-            "success": False,
-            "message": f"Error verifying document: {str(e)}"
-        }
+# Create MCP server; the tools and lifespan live in _mcp_common
+server = create_server()
 
 if __name__ == "__main__":
     server.run()
\ No newline at end of file
@@ -1,24 +1,25 @@
 // scripts/register-document.js
 const hre = require("hardhat");
-const fs = require("fs").promises;
 const { calculateDocumentHash } = require("../utils/document-hash");
+const { useStdin, readDocumentContent } = require("./utils/read-document");
 
 async function main() {
   const [signer] = await hre.ethers.getSigners();
   
   // Command line arguments
+  // Set DOC_STDIN=1 and leave out the path to pipe the document content in
   const documentPath = process.argv[2];
   const documentType = process.argv[3] || "Generic Document";
   const metadata = process.argv[4] || "";
   
-  if (!documentPath) {
-    console.error("Please provide a document path as the first argument");
+  if (!documentPath && !useStdin()) {
+    console.error("Please provide a document path (or set DOC_STDIN=1) as the first argument");
     process.exit(1);
   }
   
   try {
     // Read document content
-    const documentContent = await fs.readFile(documentPath, "utf8");
+    const documentContent = await readDocumentContent(documentPath);
     
     // Calculate document hash
     const documentHash = calculateDocumentHash(documentContent);
@@ -0,0 +1,39 @@
+// scripts/utils/read-document.js
+const fs = require("fs").promises;
+
+/**
+ * Reads the whole of stdin as UTF-8 text
+ * @returns {Promise<string>} - The piped content
+ */
+async function readStdin() {
+  const chunks = [];
+  for await (const chunk of process.stdin) {
+    chunks.push(chunk);
+  }
+  return Buffer.concat(chunks).toString("utf8");
+}
+
+/**
+ * Whether the document content should be piped in on stdin.
+ * Set DOC_STDIN=1 to enable; hardhat run rejects extra flags, so an
+ * environment variable is the only way to reach the script
+ * @returns {boolean}
+ */
+function useStdin() {
+  return process.env.DOC_STDIN === "1";
+}
+
+/**
+ * Reads a document's content from stdin when DOC_STDIN=1, otherwise from a file
+ * @param {string} [documentPath] - Path of the document file
+ * @returns {Promise<string>} - The document content
+ */
+async function readDocumentContent(documentPath) {
+  return useStdin() ? readStdin() : fs.readFile(documentPath, "utf8");
+}
+
+module.exports = {
+  readStdin,
+  useStdin,
+  readDocumentContent
+};
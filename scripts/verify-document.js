@@ -1,21 +1,22 @@
 // scripts/verify-document.js
 const hre = require("hardhat");
-const fs = require("fs").promises;
 const { calculateDocumentHash } = require("../utils/document-hash");
+const { useStdin, readDocumentContent } = require("./utils/read-document");
 
 async function main() {
   // Command line arguments
+  // Set DOC_STDIN=1 and leave out the path to pipe the document content in
   const documentId = process.argv[2];
   const documentPath = process.argv[3];
   
-  if (!documentId || !documentPath) {
-    console.error("Please provide document ID and document path as arguments");
+  if (!documentId || (!documentPath && !useStdin())) {
+    console.error("Please provide document ID and document path (or set DOC_STDIN=1) as arguments");
     process.exit(1);
   }
   
   try {
     // Read document content
-    const documentContent = await fs.readFile(documentPath, "utf8");
+    const documentContent = await readDocumentContent(documentPath);
     
     // Calculate document hash
     const documentHash = calculateDocumentHash(documentContent);